@@ -0,0 +1,141 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from pymongo import ASCENDING, DeleteOne, ReplaceOne
+from order_service.app.config import Config, logger
+
+CHECKPOINT_ID = "delivered_orders"
+
+# Fields any writer can change; an order is only removed from the hot collection
+# if none of them changed since the archiver copied it.
+SNAPSHOT_FIELDS = ["orderStatus", "updatedAt", "emails", "deliveryAddress"]
+
+
+def archive_candidates_filter(cutoff: datetime) -> Dict[str, Any]:
+    """
+    Returns the MongoDB filter matching orders delivered before the cutoff.
+    Orders delivered before deliveredAt was tracked are given one at startup
+    by backfill_delivered_at.
+    """
+    return {"orderStatus": "delivered", "deliveredAt": {"$lt": cutoff}}
+
+
+def ensure_archive_indexes(app) -> None:
+    """
+    Creates the indexes used by the archiver scan and by archived lookups.
+    """
+    app.orders_collection.create_index([("orderStatus", ASCENDING), ("_id", ASCENDING)])
+    app.orders_archive_collection.create_index([("orderId", ASCENDING)])
+
+
+def backfill_delivered_at(app) -> None:
+    """
+    Sets deliveredAt to now on delivered orders that predate it, so they are
+    archived ARCHIVE_AFTER_DAYS from now instead of never.
+    """
+    result = app.orders_collection.update_many(
+        {"orderStatus": "delivered", "deliveredAt": {"$exists": False}},
+        [{"$set": {"deliveredAt": "$$NOW"}}],
+    )
+    if result.modified_count:
+        logger.info(f"Backfilled deliveredAt on {result.modified_count} delivered order(s)")
+
+
+def archive_batch(app, cutoff: datetime, last_id: Optional[Any]) -> Optional[Any]:
+    """
+    Moves one batch of archivable orders from the hot collection to the archive.
+
+    Steps:
+    1. Reads up to ARCHIVE_BATCH_SIZE candidates after last_id, in _id order.
+    2. Upserts them into the archive collection (safe to repeat after a crash).
+    3. Deletes each one from the hot collection only if it still matches the
+       archived snapshot, so concurrent updates are never lost.
+    4. Removes from the archive any order that is still in the hot collection,
+       so it is retried cleanly by a later pass.
+    5. Saves the checkpoint so an interrupted pass resumes after this batch.
+
+    Returns the _id of the last order in the batch, or None when the pass is done.
+    """
+    query = archive_candidates_filter(cutoff)
+    if last_id is not None:
+        query["_id"] = {"$gt": last_id}
+
+    batch = list(
+        app.orders_collection.find(query)
+        .sort("_id", ASCENDING)
+        .limit(Config.ARCHIVE_BATCH_SIZE)
+    )
+    if not batch:
+        return None
+
+    ids = [o["_id"] for o in batch]
+    app.orders_archive_collection.bulk_write(
+        [ReplaceOne({"_id": o["_id"]}, o, upsert=True) for o in batch],
+        ordered=False,
+    )
+    result = app.orders_collection.bulk_write(
+        [DeleteOne({"_id": o["_id"], **{f: o.get(f) for f in SNAPSHOT_FIELDS}}) for o in batch],
+        ordered=False,
+    )
+
+    if result.deleted_count < len(ids):
+        changed_ids = [o["_id"] for o in app.orders_collection.find({"_id": {"$in": ids}}, {"_id": 1})]
+        app.orders_archive_collection.delete_many({"_id": {"$in": changed_ids}})
+        logger.info(f"Skipped {len(changed_ids)} order(s) modified during archiving")
+
+    app.archive_checkpoints_collection.update_one(
+        {"_id": CHECKPOINT_ID},
+        {"$set": {"cutoff": cutoff, "lastId": ids[-1], "updatedAt": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+    logger.info(f"Archived {result.deleted_count} delivered order(s)")
+    return ids[-1]
+
+
+def run_archive_pass(app) -> None:
+    """
+    Archives all orders delivered more than ARCHIVE_AFTER_DAYS ago.
+    Resumes from the saved checkpoint if the previous pass was interrupted.
+    """
+    checkpoint = app.archive_checkpoints_collection.find_one({"_id": CHECKPOINT_ID})
+    if checkpoint:
+        cutoff = checkpoint["cutoff"]
+        last_id = checkpoint["lastId"]
+        logger.info(f"Resuming archive pass after order _id {last_id}")
+    else:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=Config.ARCHIVE_AFTER_DAYS)
+        last_id = None
+        logger.info(f"Starting archive pass for orders delivered before {cutoff.isoformat()}")
+
+    while True:
+        last_id = archive_batch(app, cutoff, last_id)
+        if last_id is None:
+            break
+        time.sleep(Config.ARCHIVE_BATCH_PAUSE_SECONDS)
+
+    # Pass complete: the next one starts from the beginning with a fresh cutoff
+    app.archive_checkpoints_collection.delete_one({"_id": CHECKPOINT_ID})
+    logger.info("Archive pass complete.")
+
+
+def archive_delivered_orders(app) -> None:
+    """
+    Runs archive passes forever, sleeping ARCHIVE_INTERVAL_SECONDS between them.
+    Errors are logged and the pass is retried on the next interval.
+    """
+    logger.info("Starting order archiver thread...")
+    try:
+        ensure_archive_indexes(app)
+    except Exception as e:
+        logger.exception(f"Failed to create archive indexes: {e}")
+    try:
+        backfill_delivered_at(app)
+    except Exception as e:
+        logger.exception(f"Failed to backfill deliveredAt: {e}")
+
+    while True:
+        try:
+            run_archive_pass(app)
+        except Exception as e:
+            logger.exception(f"Error during archive pass: {e}")
+        time.sleep(Config.ARCHIVE_INTERVAL_SECONDS)
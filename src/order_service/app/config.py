@@ -18,4 +18,8 @@ class Config:
     RABBITMQ_QUEUE_NAME = os.getenv("RABBITMQ_QUEUE_NAME")
     RABBITMQ_URI = os.getenv("RABBITMQ_URI")
     RABBITMQ_USERNAME = os.getenv("RABBITMQ_USERNAME")
-    RABBITMQ_PASSWORD = os.getenv("RABBITMQ_PASSWORD")
\ No newline at end of file
+    RABBITMQ_PASSWORD = os.getenv("RABBITMQ_PASSWORD")
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+    ARCHIVE_BATCH_PAUSE_SECONDS = float(os.getenv("ARCHIVE_BATCH_PAUSE_SECONDS", "0.5"))
+    ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
\ No newline at end of file
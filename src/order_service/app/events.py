@@ -61,7 +61,8 @@ def consume_user_update_events(app) -> None:
             if delivery_address:
                 update_fields["deliveryAddress"] = delivery_address
 
-            # Access MongoDB from FastAPI app context
+            # Access MongoDB from FastAPI app context.
+            # Only the hot collection is updated; archived orders keep their history.
             orders_collection = app.orders_collection
             result = orders_collection.update_many({"userId": user_id}, {"$set": update_fields})
 
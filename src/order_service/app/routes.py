@@ -1,5 +1,6 @@
 import uuid
 from bson import ObjectId
+from pymongo import ReturnDocument
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.encoders import jsonable_encoder
 from datetime import datetime, timezone
@@ -12,6 +13,16 @@ def serialize_order(order):
     order["_id"] = str(order["_id"])
     return order
 
+def raise_order_missing(request: Request, id: str):
+    """
+    Raises 409 if the order has been moved to the archive, 404 otherwise.
+    """
+    if request.app.orders_archive_collection.find_one({"orderId": id}):
+        logger.warning(f"Order is archived and cannot be modified: {id}")
+        raise HTTPException(status_code=409, detail="Order is archived")
+    logger.error(f"Order not found: {id}")
+    raise HTTPException(status_code=404, detail="Order not found")
+
 @router.post("/")
 async def create_order(request: Request, order: OrderModel):
     logger.info(f"Creating order for user {order.userId}")
@@ -26,6 +37,8 @@ async def create_order(request: Request, order: OrderModel):
     
     order_dict["createdAt"] = datetime.now(timezone.utc)
     order_dict["updatedAt"] = datetime.now(timezone.utc)
+    if order_dict["orderStatus"] == "delivered":
+        order_dict["deliveredAt"] = order_dict["updatedAt"]
 
     inserted_id = orders_collection.insert_one(order_dict).inserted_id
     created_order = orders_collection.find_one({"_id": ObjectId(inserted_id)})
@@ -34,13 +47,18 @@ async def create_order(request: Request, order: OrderModel):
     return {"status": "success", "order": serialize_order(created_order)}
 
 @router.get("/")
-async def get_orders(request: Request, status: str):
-    logger.info(f"Fetching orders with status '{status}'")
+async def get_orders(request: Request, status: str, include_archived: bool = False):
+    logger.info(f"Fetching orders with status '{status}' (include_archived={include_archived})")
     if status not in ["under process", "shipping", "delivered"]:
         logger.warning(f"Invalid order status requested: {status}")
         raise HTTPException(status_code=400, detail="Invalid status")
     orders_collection = request.app.orders_collection
     orders = list(orders_collection.find({"orderStatus": status}))
+    if include_archived and status == "delivered":
+        # An order being archived briefly exists in both collections; keep the hot copy
+        hot_ids = {o["_id"] for o in orders}
+        archived = request.app.orders_archive_collection.find({"orderStatus": status})
+        orders += [o for o in archived if o["_id"] not in hot_ids]
     logger.info(f"Found {len(orders)} orders with status '{status}'")
     for o in orders:
         o["_id"] = str(o["_id"])
@@ -57,13 +75,18 @@ async def update_order_status(id: str, request: Request, data: dict):
     
     old_order = orders_collection.find_one({"orderId": id})
     if not old_order:
-        logger.error(f"Order not found: {id}")
-        raise HTTPException(status_code=404, detail="Order not found")
+        raise_order_missing(request, id)
     
-    data["updatedAt"] = datetime.now(timezone.utc)
+    update_fields = {"orderStatus": data["orderStatus"], "updatedAt": datetime.now(timezone.utc)}
+    if data["orderStatus"] == "delivered" and old_order["orderStatus"] != "delivered":
+        update_fields["deliveredAt"] = update_fields["updatedAt"]
     
-    orders_collection.update_one({"orderId": id}, {"$set": {"orderStatus": data["orderStatus"]}})
-    new_order = orders_collection.find_one({"orderId": id})
+    # The archiver may have moved the order since it was read above
+    new_order = orders_collection.find_one_and_update(
+        {"orderId": id}, {"$set": update_fields}, return_document=ReturnDocument.AFTER
+    )
+    if not new_order:
+        raise_order_missing(request, id)
     logger.info(f"Order {id} status updated successfully to '{data['orderStatus']}'")
     return {"status": "success", "after": serialize_order(new_order)}
 
@@ -84,12 +107,15 @@ async def update_order_details(id: str, request: Request, data: dict):
     
     old_order = orders_collection.find_one({"orderId": id})
     if not old_order:
-        logger.error(f"Order not found: {id}")
-        raise HTTPException(status_code=404, detail="Order not found")
+        raise_order_missing(request, id)
     
     data["updatedAt"] = datetime.now(timezone.utc)
     
-    orders_collection.update_one({"orderId": id}, {"$set": data})
-    new_order = orders_collection.find_one({"orderId": id})
+    # The archiver may have moved the order since it was read above
+    new_order = orders_collection.find_one_and_update(
+        {"orderId": id}, {"$set": data}, return_document=ReturnDocument.AFTER
+    )
+    if not new_order:
+        raise_order_missing(request, id)
     logger.info(f"Order {id} details updated successfully.")
     return {"status": "success", "before": serialize_order(old_order), "after": serialize_order(new_order)}
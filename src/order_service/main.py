@@ -3,6 +3,7 @@ from pymongo import MongoClient
 from order_service.app.config import Config
 from order_service.app.routes import router as order_router
 from order_service.app.events import consume_user_update_events
+from order_service.app.archiver import archive_delivered_orders
 import threading
 
 app = FastAPI(title="Order Service")
@@ -11,6 +12,8 @@ app = FastAPI(title="Order Service")
 client = MongoClient(Config.MONGO_URI)
 db = client[Config.ORDER_DB]
 app.orders_collection = db["orders"]
+app.orders_archive_collection = db["orders_archive"]
+app.archive_checkpoints_collection = db["archive_checkpoints"]
 
 
 # === Include routes ===
@@ -22,4 +25,10 @@ def start_rabbitmq_consumer():
     threading.Thread(target=consume_user_update_events, args=(app,), daemon=True).start()
     print("RabbitMQ consumer thread started.")
 
+# === Start delivered-order archiver in background thread ===
+@app.on_event("startup")
+def start_order_archiver():
+    threading.Thread(target=archive_delivered_orders, args=(app,), daemon=True).start()
+    print("Order archiver thread started.")
+
 